@@ -18,12 +18,50 @@ Usage:
     python session_analyzer.py   # auto-detects most recent dump
 """
 
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import pickle
 import re
 import sys
 from pathlib import Path
 from collections import Counter
 from datetime import datetime
 
+try:
+    import ahocorasick  # optional accelerator (pip install pyahocorasick)
+except ImportError:
+    ahocorasick = None
+
+try:
+    import numpy as np  # optional accelerator for match bucketing
+except ImportError:
+    np = None
+
+try:
+    import re2  # optional linear-time regex engine (pip install google-re2)
+except ImportError:
+    re2 = None
+
+
+def _compile_fast(pattern):
+    """Compile a bytes pattern via RE2 when available, else stdlib re.
+
+    RE2 guarantees linear-time matching, which protects the whole-transcript
+    scans from pathological dumps. Its wrapper disagrees with re about flag
+    arguments and named-group access, so eligible patterns use inline flags
+    ((?i)/(?s)) and positional groups only; anything RE2 cannot express
+    (lookaheads, repetition bounds over 1000) silently stays on stdlib re.
+    """
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            pass
+    return re.compile(pattern)
+
 
 # ---------------------------------------------------------------------------
 # Health thresholds (derived from analysis of ~30 real sessions)
@@ -56,6 +94,311 @@ TOOL_ERROR_PATTERNS = [
     r'No such file',
 ]
 
+CORRECTION_PATTERNS = [
+    r"\b(no|nope|wrong|incorrect|that's not right|stop|revert|undo)\b",
+    r"\b(don't|do not|shouldn't|should not)\b.*\b(do|use|try)\b",
+]
+
+CLARIFICATION_PATTERNS = [
+    r'\b(actually|instead|what I meant|should be|to clarify)\b',
+    r'\b(try|use|do)\b.*\binstead\b',
+]
+
+
+# ---------------------------------------------------------------------------
+# Compiled patterns
+#
+# analyze() runs these in a hot loop over every turn of a potentially
+# multi-megabyte transcript, so compile everything once at import time
+# instead of leaning on re's internal pattern cache on every call.
+#
+# Whole-transcript patterns are bytes patterns: analyze() mmaps the dump and
+# scans the raw buffer in place, decoding only the small captured groups.
+# This keeps peak memory near the file size instead of the up-to-4x blowup
+# of decoding a multi-megabyte file into a str before scanning it.
+# ---------------------------------------------------------------------------
+
+_RE_SESSION_ID = re.compile(rb'Session ID: ([a-f0-9-]+)')
+_RE_DUMPED_AT = re.compile(rb'Dumped at: (.+)')
+_RE_USER_HEADER = re.compile(rb'## USER\n')
+# Bounded repetitions and negated character classes instead of lazy .*?
+# spans: the unbounded form made every non-matching '## USER' section a
+# worst case for the backtracking engine. [^\]]/[^}] fail fast at structural
+# boundaries, the {0,N} bounds cap backtracking depth, and (?:[^"\\]|\\.)
+# steps over escaped quotes inside the message text.
+# Stays on stdlib re: the repetition bounds exceed RE2's limit of 1000, and
+# letting _compile_fast discover that would log a parse error on every run.
+_RE_USER_TEXT = re.compile(
+    rb'(?s)## USER\n\[[^\]]{0,4000}?"type":\s*"text"[^}]{0,2000}?'
+    rb'"text":\s*"((?:[^"\\]|\\.){1,5000})"')
+_RE_TURN_TEXT = _compile_fast(rb'"text": "([^"]*)"')
+_RE_ERROR_CONTENT = _compile_fast(
+    rb'(?s)"is_error": true.*?"content": "([^"]{0,200})')
+_RE_TZ_ABBREV = re.compile(r'\s+(PST|PDT|EST|EDT|CST|CDT|MST|MDT|UTC)\s*')
+
+# Whole-transcript counts that need captures or case folding, folded into one
+# alternation so a single finditer pass replaces independent full scans. Each
+# branch tags its matches with a named group; the dispatch loop in analyze()
+# switches on Match.lastgroup. Fixed-literal counts (section headers,
+# tool_use_id) don't need the regex engine at all — they go through the
+# memmem-backed helpers below instead.
+# The frustration branch is a zero-width lookahead: consuming its (up to
+# 4KB) span would hide any tool-name / file-mod / direction matches inside
+# it. [^\x00] stands in for DOTALL's '.', which cannot be set per-branch.
+_RE_COMBINED = re.compile(
+    rb'"name": "(?P<name>[^"]+)"'
+    rb'|File (?:created|written|modified) successfully at: (?P<fmod>[^\n]+)'
+    rb'|(?i:(?P<dir>try again|different approach|let me try))'
+    rb'|(?=(?i:## USER[^\x00]{0,4000}?"text": "[^"]*'
+    rb'\b(?P<frust>still|again|same issue)\b))')
+
+_TOOL_ERROR_RES = [
+    _compile_fast(b'(?i)' + p.encode('ascii')) for p in TOOL_ERROR_PATTERNS]
+
+# Most TOOL_ERROR_PATTERNS are plain substrings; one pass of this combined
+# alternation over the mmapped transcript finds all of them at once instead
+# of 9 separate scans. The dict index is the pattern's position in
+# TOOL_ERROR_PATTERNS; _ERROR_LITERAL_IDS maps a (lowercased) match back to
+# that index.
+_TOOL_ERROR_LITERALS = {
+    0: b'psql: error:',
+    1: b'enoent',
+    2: b'cannot find',
+    3: b'permission denied',
+    6: b'syntaxerror',
+    7: b'typeerror',
+    8: b'migration failed',
+    9: b'command not found',
+    10: b'no such file',
+}
+# The two patterns with non-literal tails are prefiltered by their literal
+# prefixes in the same scan; a prefix hit is only a candidate until the full
+# regex, anchored at the hit offset, confirms it.
+_TOOL_ERROR_PREFILTER = {
+    4: b'connection',   # connection.*failed
+    5: b'error:',       # ERROR:.*\n
+}
+
+# Report category for each TOOL_ERROR_PATTERNS index, applied at detection
+# time. Mirrors the buckets the old snippet-text rules produced for each
+# pattern's typical output ('command not found' and 'No such file' never
+# matched a named bucket, so they stay Other Technical).
+_PAT_CATEGORY = {
+    0: 'Database Connection',   # psql: error:
+    1: 'File Not Found',        # ENOENT
+    2: 'File Not Found',        # cannot find
+    3: 'Permission',            # permission denied
+    4: 'Database Connection',   # connection.*failed
+    5: 'SQL/Migration',         # ERROR:.*\n
+    6: 'SQL/Migration',         # SyntaxError
+    7: 'SQL/Migration',         # TypeError
+    8: 'SQL/Migration',         # Migration failed
+    9: 'Other Technical',       # command not found
+    10: 'Other Technical',      # No such file
+}
+
+
+def _categorize_error_snippet(txt):
+    """Bucket an is_error snippet by its text, for turns where no known
+    pattern pinpointed the failure."""
+    if 'psql' in txt or 'connection' in txt:
+        return 'Database Connection'
+    elif 'error:' in txt or 'failed' in txt:
+        return 'SQL/Migration'
+    elif 'enoent' in txt or 'cannot find' in txt:
+        return 'File Not Found'
+    elif 'permission' in txt:
+        return 'Permission'
+    return 'Other Technical'
+
+_RE_ERROR_LITERALS = _compile_fast(
+    b'(?i)' + b'|'.join(
+        re.escape(lit) for lit in
+        list(_TOOL_ERROR_LITERALS.values()) + list(_TOOL_ERROR_PREFILTER.values())))
+_RE_IS_ERROR = _compile_fast(rb'"is_error": true')
+_ERROR_LITERAL_IDS = {lit: pid for pid, lit in _TOOL_ERROR_LITERALS.items()}
+_ERROR_LITERAL_IDS.update({lit: pid for pid, lit in _TOOL_ERROR_PREFILTER.items()})
+
+
+def _first_index_by_turn(positions, starts):
+    """Map turn index -> index of that turn's first hit in `positions`.
+
+    `positions` are ascending byte offsets from a whole-buffer scan; `starts`
+    are the turn header-end offsets. With numpy the bucketing is a single
+    vectorized searchsorted; the fallback bisects per position.
+    """
+    out = {}
+    if np is not None and positions:
+        ids = np.searchsorted(
+            np.asarray(starts, dtype=np.int64),
+            np.asarray(positions, dtype=np.int64), side='right') - 1
+        uniq, first = np.unique(ids, return_index=True)
+        for turn, idx in zip(uniq.tolist(), first.tolist()):
+            if turn >= 0:
+                out[turn] = idx
+        return out
+    for idx, pos in enumerate(positions):
+        turn = bisect.bisect_right(starts, pos) - 1
+        if turn >= 0 and turn not in out:
+            out[turn] = idx
+    return out
+
+
+def _bucket_error_hits(content, starts):
+    """Map turn index -> first confirmed error-pattern hit in that turn.
+
+    One case-insensitive pass of the combined literal alternation finds both
+    the plain error literals and the literal prefixes of the two wildcard
+    patterns; for prefixes, the wildcard regex runs anchored at the candidate
+    offset instead of scanning the whole turn. Returns
+    {turn: (offset, pattern_id, match)} with match None for plain literals.
+    """
+    hits = {}
+    for em in _RE_ERROR_LITERALS.finditer(content):
+        turn = bisect.bisect_right(starts, em.start()) - 1
+        if turn < 0 or turn in hits:
+            continue
+        pat_id = _ERROR_LITERAL_IDS[em.group().lower()]
+        if pat_id in _TOOL_ERROR_PREFILTER:
+            cm = _TOOL_ERROR_RES[pat_id].match(content, em.start())
+            if cm is None:
+                continue  # prefix without the wildcard tail; keep looking
+            hits[turn] = (em.start(), pat_id, cm)
+        else:
+            hits[turn] = (em.start(), pat_id, None)
+    return hits
+
+
+# Message-category keywords, matched as plain substrings of the lowercased
+# message (same semantics as the original `any(w in ml ...)` chains).
+# Order is the classification priority.
+_CATEGORY_KEYWORDS = {
+    'guidance': ['read', 'check', 'try', 'run', 'create', 'update', 'fix', 'implement'],
+    'approval': ['good', 'looks good', 'perfect', 'yes', 'correct', 'right'],
+    'corrections': ['no', 'wrong', 'incorrect', 'stop', "don't", "shouldn't"],
+}
+_CATEGORY_ORDER = ('guidance', 'approval', 'corrections')
+# Bytes copies of the keyword lists for the stdlib path: lowercasing an
+# ASCII-heavy message via bytes.translate skips the general Unicode case
+# mapping, and substring checks on bytes use memmem under the hood.
+_CATEGORY_KEYWORDS_B = {
+    _cat: [_kw.encode('ascii') for _kw in _kws]
+    for _cat, _kws in _CATEGORY_KEYWORDS.items()
+}
+_TO_LOWER = bytes.maketrans(bytes(range(65, 91)), bytes(range(97, 123)))
+# Below this many messages the per-message automaton overhead outweighs the
+# ~20 substring scans it saves; stick with the plain `in` path.
+_CAT_AC_MIN_MSGS = 500
+
+if ahocorasick is not None:
+    _CAT_AC = ahocorasick.Automaton()
+    for _cat, _kws in _CATEGORY_KEYWORDS.items():
+        for _kw in _kws:
+            _CAT_AC.add_word(_kw, _cat)
+    _CAT_AC.make_automaton()
+else:
+    _CAT_AC = None
+
+
+def _categorize_messages(real_msgs):
+    """Bucket user messages into guidance/approval/corrections/questions/other.
+
+    On large batches a single Aho-Corasick walk per message replaces the ~20
+    substring scans of the keyword chains; small batches and stdlib-only
+    installs use the original `in` checks.
+    """
+    cats = {'guidance': 0, 'approval': 0, 'corrections': 0, 'questions': 0, 'other': 0}
+    use_ac = _CAT_AC is not None and len(real_msgs) > _CAT_AC_MIN_MSGS
+    for msg in real_msgs:
+        if use_ac:
+            tags = set()
+            for _, tag in _CAT_AC.iter(msg.lower()):
+                tags.add(tag)
+                if len(tags) == len(_CATEGORY_ORDER):
+                    break
+            cat = next((c for c in _CATEGORY_ORDER if c in tags), None)
+        else:
+            ml = msg.encode('utf-8', 'ignore').translate(_TO_LOWER)
+            cat = next((c for c in _CATEGORY_ORDER
+                        if any(w in ml for w in _CATEGORY_KEYWORDS_B[c])), None)
+        if cat is not None:
+            cats[cat] += 1
+        elif '?' in msg:
+            cats['questions'] += 1
+        else:
+            cats['other'] += 1
+    return cats
+
+
+_CORRECTION_RES = [re.compile(p, re.IGNORECASE) for p in CORRECTION_PATTERNS]
+_CLARIFICATION_RES = [re.compile(p, re.IGNORECASE) for p in CLARIFICATION_PATTERNS]
+
+# Keyword tables mirroring CORRECTION_PATTERNS / CLARIFICATION_PATTERNS for
+# single-pass matching. Simple keywords decide on their own (after a word-
+# boundary check); the contextual correction pattern ("don't ... do/use/try")
+# is only confirmed by its regex when one of its trigger words actually
+# occurs. The contextual clarification pattern needs no trigger of its own:
+# any match of it contains \binstead\b, which is already a simple keyword.
+_CORRECTION_KEYWORDS = [
+    'no', 'nope', 'wrong', 'incorrect', "that's not right",
+    'stop', 'revert', 'undo',
+]
+_CORRECTION_TRIGGERS = ["don't", 'do not', "shouldn't", 'should not']
+_CLARIFICATION_KEYWORDS = [
+    'actually', 'instead', 'what i meant', 'should be', 'to clarify',
+]
+
+if ahocorasick is not None:
+    _PHRASE_AC = ahocorasick.Automaton()
+    for _kw in _CORRECTION_KEYWORDS:
+        _PHRASE_AC.add_word(_kw, ('correction', _kw))
+    for _kw in _CORRECTION_TRIGGERS:
+        _PHRASE_AC.add_word(_kw, ('correction_ctx', _kw))
+    for _kw in _CLARIFICATION_KEYWORDS:
+        _PHRASE_AC.add_word(_kw, ('clarification', _kw))
+    _PHRASE_AC.make_automaton()
+else:
+    _PHRASE_AC = None
+
+
+def _on_word_boundary(text, start, end):
+    """True if text[start:end] sits on \\b-style word boundaries."""
+    if start > 0:
+        c = text[start - 1]
+        if c.isalnum() or c == '_':
+            return False
+    if end < len(text):
+        c = text[end]
+        if c.isalnum() or c == '_':
+            return False
+    return True
+
+
+def _classify_user_text(text_lower):
+    """Return (is_correction, is_clarification) for a lowercased message.
+
+    One Aho-Corasick walk replaces four regex evaluations per message when
+    pyahocorasick is installed; the stdlib fallback keeps the original
+    compiled-regex checks.
+    """
+    if _PHRASE_AC is None:
+        return (any(p.search(text_lower) for p in _CORRECTION_RES),
+                any(p.search(text_lower) for p in _CLARIFICATION_RES))
+    correction = clarification = ctx_candidate = False
+    for end, (kind, kw) in _PHRASE_AC.iter(text_lower):
+        start = end - len(kw) + 1
+        if not _on_word_boundary(text_lower, start, end + 1):
+            continue
+        if kind == 'correction':
+            correction = True
+        elif kind == 'clarification':
+            clarification = True
+        else:
+            ctx_candidate = True
+    if ctx_candidate and not correction:
+        correction = _CORRECTION_RES[1].search(text_lower) is not None
+    return correction, clarification
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -76,112 +419,314 @@ def status_for(metric, value):
     return '❌'
 
 
+def _count_occurrences(buf, needle):
+    """Count non-overlapping occurrences of needle in a bytes-like buffer.
+
+    mmap has no .count(); repeated .find() dispatches to C memmem and only
+    costs Python-level work per match, not per byte.
+    """
+    n = 0
+    pos = buf.find(needle)
+    while pos != -1:
+        n += 1
+        pos = buf.find(needle, pos + len(needle))
+    return n
+
+
+def _count_header_lines(buf, header):
+    """Count lines consisting exactly of `header` — the literal equivalent of
+    len(re.findall(rb'^' + header + rb'$', buf, re.MULTILINE))."""
+    hlen = len(header)
+    needle = b'\n' + header + b'\n'
+    # The trailing newline of one match can be the leading newline of the
+    # next (back-to-back headers), so advance only past the header itself.
+    n = 0
+    pos = buf.find(needle)
+    while pos != -1:
+        n += 1
+        pos = buf.find(needle, pos + hlen + 1)
+    if buf[:hlen + 1] == header + b'\n' or (len(buf) == hlen and buf[:hlen] == header):
+        n += 1
+    if len(buf) > hlen and buf[len(buf) - hlen - 1:] == b'\n' + header:
+        n += 1
+    return n
+
+
+def _count_newlines(buf):
+    """Count b'\\n' occurrences in a bytes-like buffer.
+
+    mmap objects have no .count(), and copying the whole buffer into bytes
+    just to count would defeat the point of mapping it; count in bounded
+    chunks instead (bytes.count dispatches to libc memchr).
+    """
+    chunk = 1 << 20
+    mv = memoryview(buf)
+    return sum(bytes(mv[off:off + chunk]).count(b'\n')
+               for off in range(0, len(mv), chunk))
+
+
+def _sibling_metadata(sibling):
+    """Read a sibling dump's session id / timestamp, cached in a sidecar file.
+
+    Opening and regex-scanning a 5KB header from every sibling on every run
+    adds up in dump directories with many sessions. The parsed fields are
+    cached next to the dump in a .meta.json that is refreshed whenever the
+    dump itself is newer; caching is best-effort and skipped on read-only
+    directories.
+    """
+    st = sibling.stat()
+    meta_path = sibling.with_suffix('.meta.json')
+    try:
+        if meta_path.stat().st_mtime >= st.st_mtime:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    with open(sibling, 'rb') as f:
+        header = f.read(5000)
+    sib_sid = _RE_SESSION_ID.search(header)
+    sib_ts = _RE_DUMPED_AT.search(header)
+    meta = {
+        'session_id': sib_sid.group(1).decode('ascii', 'replace') if sib_sid else None,
+        'dumped_at': sib_ts.group(1).decode('utf-8', 'replace') if sib_ts else None,
+        'size_kb': st.st_size // 1024,
+    }
+    tmp_path = Path(str(meta_path) + '.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        tmp_path.replace(meta_path)  # atomic: readers never see partial JSON
+    except OSError:
+        pass
+    return meta
+
+
 def parse_timestamp(ts_str):
     """Parse a timestamp string, stripping timezone abbreviations."""
-    cleaned = re.sub(r'\s+(PST|PDT|EST|EDT|CST|CDT|MST|MDT|UTC)\s*', ' ', ts_str).strip()
-    for fmt in ['%a %b %d %H:%M:%S %Y', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S']:
-        try:
-            return datetime.strptime(cleaned, fmt)
-        except ValueError:
-            continue
-    return None
+    cleaned = _RE_TZ_ABBREV.sub(' ', ts_str).strip()
+    # fromisoformat is implemented in C and covers both ISO-style forms the
+    # dumps use ('%Y-%m-%d %H:%M:%S' and the T-separated variant), an order
+    # of magnitude faster than strptime, which re-parses its format string
+    # on every call. strptime remains only for the ctime-style form.
+    try:
+        return datetime.fromisoformat(cleaned.replace(' ', 'T', 1))
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(cleaned, '%a %b %d %H:%M:%S %Y')
+    except ValueError:
+        return None
 
 
 # ---------------------------------------------------------------------------
 # Core analysis — extracts all corrected metrics from a single conversation
 # ---------------------------------------------------------------------------
 
+_CACHE_DIR = Path.home() / '.cache' / 'claude-reflections'
+# Bump when the metrics dict shape changes, so stale pickles are ignored.
+_CACHE_VERSION = '1'
+
+
+def _cache_token(filepath):
+    """Byte string identifying a dump's analysis inputs, or None.
+
+    Covers the dump's own path/size/mtime plus the size/mtime of every
+    sibling conversation.md — the AFK timeline reads those, so a new sibling
+    dump must invalidate the cache even when this file is unchanged.
+    """
+    p = Path(filepath).resolve()
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    parts = [_CACHE_VERSION, str(p), str(st.st_size), str(st.st_mtime_ns)]
+    dump_dir = p.parent.parent
+    try:
+        for sibling in sorted(dump_dir.glob('*/conversation.md')):
+            sst = sibling.stat()
+            parts.append(f'{sibling}:{sst.st_size}:{sst.st_mtime_ns}')
+    except OSError:
+        pass
+    return '\n'.join(parts).encode('utf-8')
+
+
 def analyze(filepath):
-    """Run full analysis on a conversation dump. Returns a metrics dict."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+    """Run full analysis on a conversation dump. Returns a metrics dict.
+
+    Results are cached under ~/.cache/claude-reflections keyed by the dump's
+    (and its siblings') size and mtime: re-running on unchanged dumps — the
+    common case when iterating on report output — loads a pickle instead of
+    re-scanning megabytes of transcript. Caching is best-effort; any cache
+    error falls through to a fresh analysis.
+    """
+    token = _cache_token(filepath)
+    cache_path = None
+    if token is not None:
+        cache_path = _CACHE_DIR / (hashlib.sha256(token).hexdigest() + '.pickle')
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            pass
+
+    metrics = _analyze_uncached(filepath)
+
+    if cache_path is not None:
+        try:
+            _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(metrics, f)
+            tmp_path.replace(cache_path)
+        except OSError:
+            pass
+    return metrics
+
+
+def _analyze_uncached(filepath):
+    """Scan a conversation dump and extract the metrics dict."""
+    # Map the dump read-only and scan the raw bytes in place; the OS page
+    # cache serves the repeat passes and nothing is decoded except the small
+    # captured groups. (Zero-length files cannot be mapped.)
+    with open(filepath, 'rb') as f:
+        try:
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            content = f.read()
 
     p = Path(filepath)
     m = {}  # metrics
 
     # --- Session metadata ---
-    sid = re.search(r'Session ID: ([a-f0-9-]+)', content)
-    m['session_id'] = sid.group(1)[:8] if sid else 'unknown'
+    sid = _RE_SESSION_ID.search(content)
+    m['session_id'] = sid.group(1)[:8].decode('ascii', 'replace') if sid else 'unknown'
 
-    ts = re.search(r'Dumped at: (.+)', content)
-    m['timestamp'] = ts.group(1).strip() if ts else 'unknown'
+    ts = _RE_DUMPED_AT.search(content)
+    dumped_at = ts.group(1).decode('utf-8', 'replace') if ts else None
+    m['timestamp'] = dumped_at.strip() if dumped_at else 'unknown'
 
     m['file_size_kb'] = p.stat().st_size // 1024
-    m['lines'] = len(content.split('\n'))
+    # Count lines without splitting: the old len(content.split('\n')) built a
+    # throwaway list of every line and also counted a phantom empty line on
+    # newline-terminated files.
+    newlines = _count_newlines(content)
+    m['lines'] = newlines if content[-1:] == b'\n' else newlines + 1
 
     # --- Raw counts (what the dump looks like at face value) ---
-    m['raw_user_sections'] = len(re.findall(r'^## USER$', content, re.MULTILINE))
-    m['raw_assistant_sections'] = len(re.findall(r'^## ASSISTANT$', content, re.MULTILINE))
-    m['raw_tool_calls'] = len(re.findall(r'"tool_use_id":', content))
+    # Fixed literals are counted with memmem-backed buffer scans; everything
+    # needing captures or case folding shares the combined pass below.
+    m['raw_user_sections'] = _count_header_lines(content, b'## USER')
+    m['raw_assistant_sections'] = _count_header_lines(content, b'## ASSISTANT')
+    m['raw_tool_calls'] = _count_occurrences(content, b'"tool_use_id":')
+
+    direction_changes = frustration_markers = 0
+    last_frust_span = None
+    files_modified = Counter()
+    tool_usage = Counter()
+    for cm in _RE_COMBINED.finditer(content):
+        kind = cm.lastgroup
+        if kind == 'name':
+            tool_usage[cm.group('name').decode('utf-8', 'replace')] += 1
+        elif kind == 'fmod':
+            files_modified[cm.group('fmod').decode('utf-8', 'replace')] += 1
+        elif kind == 'dir':
+            direction_changes += 1
+        else:  # 'frust'
+            # Several headers can look ahead to the same marker word; count
+            # each captured marker span once.
+            span = cm.span('frust')
+            if span != last_frust_span:
+                frustration_markers += 1
+                last_frust_span = span
+
+    # Header offsets drive both user-text extraction and the per-turn loop.
+    # Walking offsets instead of content.split('## USER\n') avoids copying
+    # every turn into its own string (O(file size) extra memory).
+    starts = [h.end() for h in _RE_USER_HEADER.finditer(content)]
+    bounds = starts + [len(content)]
 
     # --- Corrected user messages ---
     # Most "## USER" sections are tool results, not the human typing.
     # Extract only actual text messages, filtering out IDE file-open events.
-    user_text_messages = re.findall(
-        r'## USER\n\[.*?"type": "text".*?"text": "([^"]+)"', content, re.DOTALL)
+    # The "text" field sits at the top of its section, so each search is
+    # clamped to the first ~4 KB rather than letting the lazy repetitions
+    # wander through megabytes of tool-result payload.
+    user_text_messages = []
+    for i, s in enumerate(starts):
+        sect = s - 8  # _RE_USER_TEXT matches from the '## USER\n' header
+        tm = _RE_USER_TEXT.search(content, sect, min(sect + 4096, bounds[i + 1]))
+        if tm:
+            user_text_messages.append(tm.group(1).decode('utf-8', 'replace'))
     real_msgs = [msg for msg in user_text_messages if '<ide_opened_file>' not in msg]
     m['real_user_msgs'] = len(real_msgs)
 
     # Categorize user messages
-    cats = {'guidance': 0, 'approval': 0, 'corrections': 0, 'questions': 0, 'other': 0}
-    for msg in real_msgs:
-        ml = msg.lower()
-        if any(w in ml for w in ['read', 'check', 'try', 'run', 'create', 'update', 'fix', 'implement']):
-            cats['guidance'] += 1
-        elif any(w in ml for w in ['good', 'looks good', 'perfect', 'yes', 'correct', 'right']):
-            cats['approval'] += 1
-        elif any(w in ml for w in ['no', 'wrong', 'incorrect', 'stop', "don't", "shouldn't"]):
-            cats['corrections'] += 1
-        elif '?' in msg:
-            cats['questions'] += 1
-        else:
-            cats['other'] += 1
-    m['msg_categories'] = cats
+    m['msg_categories'] = _categorize_messages(real_msgs)
     m['user_messages'] = real_msgs
 
     # --- Separate tool errors from user corrections ---
-    user_turns = content.split('## USER\n')
+    # Every detector runs once over the whole buffer; hits are bucketed into
+    # turns by offset (vectorized searchsorted with numpy). The loop below
+    # then only does per-turn work where something actually matched.
+    error_hits = _bucket_error_hits(content, starts)
+
+    err_positions = [em.start() for em in _RE_IS_ERROR.finditer(content)]
+    is_error_hits = {turn: err_positions[i] for turn, i
+                     in _first_index_by_turn(err_positions, starts).items()}
 
     tool_errors = []
+    error_categories = Counter()
     user_corrections = []
     user_clarifications = []
 
-    for i, turn in enumerate(user_turns[1:], 1):
-        user_text_match = re.search(r'"text": "([^"]*)"', turn)
-        user_text = user_text_match.group(1) if user_text_match else ""
-
-        has_tool_error = '"is_error": true' in turn
-        tool_error_match = any(re.search(pat, turn, re.IGNORECASE) for pat in TOOL_ERROR_PATTERNS)
+    for i, lo in enumerate(starts):
+        hi = bounds[i + 1]
+        is_error_pos = is_error_hits.get(i, -1)
+        err_hit = error_hits.get(i)
 
-        if has_tool_error or tool_error_match:
+        if is_error_pos != -1 or err_hit is not None:
+            # Detection already knows where the error is; build the snippet
+            # from that span instead of re-scanning the turn.
             snippet = ""
-            if has_tool_error:
-                em = re.search(r'"is_error": true.*?"content": "([^"]{0,200})', turn, re.DOTALL)
+            if is_error_pos != -1:
+                em = _RE_ERROR_CONTENT.search(content, is_error_pos, hi)
                 if em:
-                    snippet = em.group(1).replace('\\n', ' ')[:100]
-            elif tool_error_match:
-                for pat in TOOL_ERROR_PATTERNS:
-                    em = re.search(f'({pat}[^\\n]{{0,100}})', turn, re.IGNORECASE)
-                    if em:
-                        snippet = em.group(1)
-                        break
-            tool_errors.append({'turn': i, 'error': snippet})
+                    snippet = em.group(1).decode(
+                        'utf-8', 'replace').replace('\\n', ' ')[:100]
+                error_categories[_categorize_error_snippet(snippet.lower())] += 1
+            else:
+                start, pat_id, cm = err_hit
+                if cm is None:
+                    end = min(start + len(_TOOL_ERROR_LITERALS[pat_id]) + 100, hi)
+                    seg = content[start:end]
+                    nl = seg.find(b'\n')
+                    if nl != -1:
+                        seg = seg[:nl]
+                    snippet = seg.decode('utf-8', 'replace')
+                else:
+                    # Extend the confirmed match by up to 100 non-newline
+                    # bytes, matching the old ({pat}[^\n]{0,100}) capture.
+                    s, e = cm.span()
+                    tail = content[e:min(e + 100, hi)]
+                    nl = tail.find(b'\n')
+                    if nl != -1:
+                        tail = tail[:nl]
+                    snippet = (content[s:e] + tail).decode('utf-8', 'replace')
+                error_categories[_PAT_CATEGORY[pat_id]] += 1
+            tool_errors.append({'turn': i + 1, 'error': snippet})
             continue
 
         # Only check for corrections in turns that aren't tool errors
-        correction_pats = [
-            r"\b(no|nope|wrong|incorrect|that's not right|stop|revert|undo)\b",
-            r"\b(don't|do not|shouldn't|should not)\b.*\b(do|use|try)\b",
-        ]
-        if any(re.search(p, user_text, re.IGNORECASE) for p in correction_pats):
-            user_corrections.append({'turn': i, 'text': user_text[:150]})
-
-        clarification_pats = [
-            r'\b(actually|instead|what I meant|should be|to clarify)\b',
-            r'\b(try|use|do)\b.*\binstead\b',
-        ]
-        if any(re.search(p, user_text, re.IGNORECASE) for p in clarification_pats):
-            user_clarifications.append({'turn': i, 'text': user_text[:150]})
+        user_text_match = _RE_TURN_TEXT.search(content, lo, hi)
+        user_text = (user_text_match.group(1).decode('utf-8', 'replace')
+                     if user_text_match else "")
+        is_correction, is_clarification = _classify_user_text(user_text.lower())
+        if is_correction:
+            user_corrections.append({'turn': i + 1, 'text': user_text[:150]})
+
+        if is_clarification:
+            user_clarifications.append({'turn': i + 1, 'text': user_text[:150]})
 
     m['tool_errors'] = len(tool_errors)
     m['tool_error_details'] = tool_errors
@@ -189,37 +734,21 @@ def analyze(filepath):
     m['user_correction_details'] = user_corrections
     m['user_clarifications'] = len(user_clarifications)
 
-    # Categorize tool errors
-    error_categories = Counter()
-    for err in tool_errors:
-        txt = err['error'].lower()
-        if 'psql' in txt or 'connection' in txt:
-            error_categories['Database Connection'] += 1
-        elif 'error:' in txt or 'failed' in txt:
-            error_categories['SQL/Migration'] += 1
-        elif 'enoent' in txt or 'cannot find' in txt:
-            error_categories['File Not Found'] += 1
-        elif 'permission' in txt:
-            error_categories['Permission'] += 1
-        else:
-            error_categories['Other Technical'] += 1
+    # (Tool errors were categorized as they were detected.)
     m['error_categories'] = error_categories
 
     # --- Direction changes and frustration markers ---
-    m['direction_changes'] = len(re.findall(
-        r'(try again|different approach|let me try)', content, re.IGNORECASE))
-
-    m['frustration_markers'] = len(re.findall(
-        r'## USER.*?"text": "[^"]*\b(still|again|same issue)\b',
-        content, re.IGNORECASE | re.DOTALL))
+    # (Both counted during the combined single pass above.)
+    m['direction_changes'] = direction_changes
+    m['frustration_markers'] = frustration_markers
 
     # --- AFK / idle time detection ---
     # Look for timestamps embedded in the conversation to find gaps.
     # The dump itself has a single timestamp, but if sibling dumps exist
     # (same session, different dump times), we can compute active time.
     m['overnight_heuristic'] = False
-    if ts:
-        parsed = parse_timestamp(ts.group(1))
+    if dumped_at:
+        parsed = parse_timestamp(dumped_at)
         if parsed:
             is_late = parsed.hour >= 20 or parsed.hour <= 5
             if is_late and m['file_size_kb'] > 500:
@@ -230,17 +759,14 @@ def analyze(filepath):
     dump_dir = p.parent.parent  # e.g. .claude/context-dumps/
     if dump_dir.exists():
         for sibling in sorted(dump_dir.glob('*/conversation.md')):
-            with open(sibling, 'r', encoding='utf-8') as f:
-                header = f.read(5000)
-            sib_sid = re.search(r'Session ID: ([a-f0-9-]+)', header)
-            sib_ts = re.search(r'Dumped at: (.+)', header)
-            if sib_sid and sib_ts:
-                if sib_sid.group(1)[:8] == m['session_id']:
-                    dt = parse_timestamp(sib_ts.group(1))
+            meta = _sibling_metadata(sibling)
+            if meta['session_id'] and meta['dumped_at']:
+                if meta['session_id'][:8] == m['session_id']:
+                    dt = parse_timestamp(meta['dumped_at'])
                     if dt:
                         sibling_dumps.append({
                             'time': dt,
-                            'size_kb': sibling.stat().st_size // 1024,
+                            'size_kb': meta['size_kb'],
                         })
         sibling_dumps.sort(key=lambda x: x['time'])
 
@@ -281,12 +807,12 @@ def analyze(filepath):
         m['growth_ratio'] = None
 
     # --- Work focus ---
-    file_mods = re.findall(
-        r'File (?:created|written|modified) successfully at: ([^\n]+)', content)
-    m['files_modified'] = Counter(file_mods)
+    # (Counters filled during the combined single pass above.)
+    m['files_modified'] = files_modified
+    m['tool_usage'] = tool_usage
 
-    tool_names = re.findall(r'"name": "([^"]+)"', content)
-    m['tool_usage'] = Counter(tool_names)
+    if isinstance(content, mmap.mmap):
+        content.close()
 
     return m
 
@@ -455,15 +981,44 @@ def print_report(m, filepath):
 # CLI
 # ---------------------------------------------------------------------------
 
+def _newest_matching(root, match, recursive=True):
+    """Find the most recently modified file whose name satisfies ``match``,
+    via os.scandir with a running max — no list, no sort."""
+    best_path = None
+    best_mtime = -1.0
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif match(entry.name):
+                        mtime = entry.stat().st_mtime
+                        if mtime > best_mtime:
+                            best_mtime = mtime
+                            best_path = entry.path
+                except OSError:
+                    continue
+    return Path(best_path) if best_path else None
+
+
 def find_latest_conversation():
     """Auto-detect the most recent conversation dump."""
     dumps = Path.cwd() / '.claude' / 'context-dumps'
     search_dir = dumps if dumps.exists() else Path.cwd()
-    for pattern in ['**/conversation.md', 'conversation*.md']:
-        files = sorted(search_dir.glob(pattern), key=lambda p: p.stat().st_mtime, reverse=True)
-        if files:
-            return files[0]
-    return None
+    found = _newest_matching(search_dir, lambda name: name == 'conversation.md')
+    if found:
+        return found
+    return _newest_matching(
+        search_dir,
+        lambda name: name.startswith('conversation') and name.endswith('.md'),
+        recursive=False)
 
 
 def main():
@@ -472,23 +1027,33 @@ def main():
         sys.exit(0)
 
     if len(sys.argv) >= 2:
-        target = sys.argv[1]
+        targets = sys.argv[1:]
     else:
         found = find_latest_conversation()
         if found:
-            target = str(found)
+            targets = [str(found)]
             print(f"Auto-detected: {found}\n")
         else:
             print(__doc__)
             sys.exit(1)
 
-    target_path = Path(target)
-    if not target_path.is_file():
-        print(f"Error: File not found: {target}")
-        sys.exit(1)
+    for target in targets:
+        if not Path(target).is_file():
+            print(f"Error: File not found: {target}")
+            sys.exit(1)
 
-    metrics = analyze(str(target_path))
-    print_report(metrics, str(target_path))
+    if len(targets) == 1:
+        print_report(analyze(targets[0]), targets[0])
+        return
+
+    # Multiple dumps (e.g. all siblings of a session): the per-file parse is
+    # independent and CPU-bound, so farm it out to worker processes and print
+    # the reports in argument order.
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor() as pool:
+        results = list(pool.map(analyze, targets))
+    for target, metrics in zip(targets, results):
+        print_report(metrics, target)
 
 
 if __name__ == '__main__':